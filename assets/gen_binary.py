@@ -5,6 +5,13 @@ Generates binary files for testing.
 import struct
 
 
+# Record header: marker, 8-char name, number of elements, 4-char type, marker
+HEADER = struct.Struct('>i8si4si')
+
+# Body of a short array of 5 8-char strings, passed as a single 40-byte block
+CHAR_DATA = struct.Struct('>i40si')
+
+
 # A single binary record of doubles
 
 filename = 'single_record.bin'
@@ -22,14 +29,11 @@ with open(filename, 'wb') as f:
 
 filename = 'single_data_array.bin'
 header = [b'KEYWORDS', 5, b'CHAR']
-marker = 16
-fmt = '>i8si4si'
+data = [b'FOPR    ', b'FGPR    ', b'FWPR    ', b'WOPR    ', b'WGPR    ']
 
-with open(filename, 'wb') as f:
-    f.write(struct.pack(fmt, marker, *header, marker))
+buf = bytearray(HEADER.size + CHAR_DATA.size)
+HEADER.pack_into(buf, 0, 16, *header, 16)
+CHAR_DATA.pack_into(buf, HEADER.size, 5 * 8, b''.join(data), 5 * 8)
 
-data = [b'FOPR    ', b'FGPR    ', b'FWPR    ', b'WOPR    ', b'WGPR    ']
-marker = 5 * 8
-fmt = f">i{'8s'*5}i"
-with open(filename, 'ab') as f:
-    f.write(struct.pack(fmt, marker, *data, marker))
+with open(filename, 'wb') as f:
+    f.write(buf)
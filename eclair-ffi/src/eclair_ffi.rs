@@ -29,6 +29,13 @@ mod ffi {
         wg_name: String,
     }
 
+    // All recognized items, sorted, together with their positions in every summary source,
+    // source after source; -1 where a source does not have an item.
+    pub(crate) struct ItemList {
+        ids: Vec<ItemId>,
+        positions: Vec<i64>,
+    }
+
     extern "Rust" {
         type SummaryManager;
 
@@ -37,6 +44,7 @@ mod ffi {
         fn make_manager() -> Box<SummaryManager>;
 
         fn add_from_files(&mut self, input_path: &str, name: &str) -> Result<()>;
+        fn add_from_files_in_background(&mut self, input_paths: Vec<String>);
         fn add_from_network(
             &mut self,
             server: &str,
@@ -51,68 +59,16 @@ mod ffi {
 
         fn length(&self) -> usize;
 
+        fn n_loading(&self) -> usize;
+
         fn summary_name(&self, index: usize) -> &str;
 
-        fn all_item_ids(&self) -> Vec<ItemId>;
+        fn item_list(&self) -> ItemList;
+
+        unsafe fn item_values<'a>(&'a self, summary_idx: usize, position: usize) -> &'a [f32];
 
         // TODO: Units.
         unsafe fn timestamps<'a>(&'a self, summary_idx: usize) -> &'a [i64];
-
-        unsafe fn time_item<'a>(&'a self, summary_idx: usize, name: &'_ str) -> &'a [f32];
-
-        unsafe fn performance_item<'a>(&'a self, summary_idx: usize, name: &'_ str) -> &'a [f32];
-
-        unsafe fn field_item<'a>(&'a self, summary_idx: usize, name: &'_ str) -> &'a [f32];
-
-        unsafe fn aquifer_item<'a>(
-            &'a self,
-            summary_idx: usize,
-            name: &'_ str,
-            index: i32,
-        ) -> &'a [f32];
-
-        unsafe fn block_item<'a>(
-            &'a self,
-            summary_idx: usize,
-            name: &'_ str,
-            index: i32,
-        ) -> &'a [f32];
-
-        unsafe fn well_item<'a>(
-            &'a self,
-            summary_idx: usize,
-            name: &'_ str,
-            well_name: &'_ str,
-        ) -> &'a [f32];
-
-        unsafe fn group_item<'a>(
-            &'a self,
-            summary_idx: usize,
-            name: &'_ str,
-            group_name: &'_ str,
-        ) -> &'a [f32];
-
-        unsafe fn region_item<'a>(
-            &'a self,
-            summary_idx: usize,
-            name: &'_ str,
-            index: i32,
-        ) -> &'a [f32];
-
-        unsafe fn cross_region_item<'a>(
-            &'a self,
-            summary_idx: usize,
-            name: &'_ str,
-            index: i32,
-        ) -> &'a [f32];
-
-        unsafe fn completion_item<'a>(
-            &'a self,
-            summary_idx: usize,
-            name: &'_ str,
-            well_name: &'_ str,
-            index: i32,
-        ) -> &'a [f32];
     }
 }
 
@@ -179,6 +135,10 @@ impl SummaryManager {
             .add_from_files(input_path, if name.is_empty() { None } else { Some(name) })
     }
 
+    pub fn add_from_files_in_background(&mut self, input_paths: Vec<String>) {
+        self.0.add_from_files_in_background(&input_paths)
+    }
+
     pub fn add_from_network(
         &mut self,
         server: &str,
@@ -206,102 +166,51 @@ impl SummaryManager {
         self.0.length()
     }
 
+    pub fn n_loading(&self) -> usize {
+        self.0.n_loading()
+    }
+
     pub fn summary_name(&self, index: usize) -> &str {
         self.0.name(index)
     }
 
-    pub fn all_item_ids(&self) -> Vec<ffi::ItemId> {
-        let mut ids: Vec<ffi::ItemId> = self
+    // The item list and the positions are built from a single sorted pass over the items, so
+    // that rebuilding both on the C++ side does not sort the items twice.
+    pub fn item_list(&self) -> ffi::ItemList {
+        let sorted_ids = self.sorted_item_ids();
+        let mut positions = Vec::with_capacity(sorted_ids.len() * self.0.length());
+        for summary_idx in 0..self.0.length() {
+            positions.extend(sorted_ids.iter().map(|(_, id)| {
+                self.0
+                    .item_position(summary_idx, id)
+                    .map_or(-1, |position| position as i64)
+            }));
+        }
+        ffi::ItemList {
+            ids: sorted_ids.into_iter().map(|(id, _)| id).collect(),
+            positions,
+        }
+    }
+
+    pub fn item_values(&self, summary_idx: usize, position: usize) -> &[f32] {
+        self.0.item_values(summary_idx, position)
+    }
+
+    // Recognized item ids from all sources in the order they are handed over to C++.
+    fn sorted_item_ids(&self) -> Vec<(ffi::ItemId, &EclItemId)> {
+        let mut ids: Vec<(ffi::ItemId, &EclItemId)> = self
             .0
             .all_item_ids()
-            .iter()
+            .into_iter()
             .filter(|el| el.qualifier.is_recognized())
-            .map(|&el| el.into())
+            .map(|el| (el.into(), el))
             .collect();
-        ids.sort();
+        // Ids are unique, so there is no need for a stable sort.
+        ids.sort_unstable_by(|a, b| a.0.cmp(&b.0));
         ids
     }
 
     pub fn timestamps(&self, summary_idx: usize) -> &[i64] {
         self.0.timestamps(summary_idx)
     }
-
-    pub fn time_item<'a>(&'a self, summary_idx: usize, name: &'_ str) -> &'a [f32] {
-        self.0.time_item(summary_idx, name).unwrap_or_default()
-    }
-
-    pub fn performance_item<'a>(&'a self, summary_idx: usize, name: &'_ str) -> &'a [f32] {
-        self.0
-            .performance_item(summary_idx, name)
-            .unwrap_or_default()
-    }
-
-    pub fn field_item<'a>(&'a self, summary_idx: usize, name: &'_ str) -> &'a [f32] {
-        self.0.field_item(summary_idx, name).unwrap_or_default()
-    }
-
-    pub fn aquifer_item<'a>(&'a self, summary_idx: usize, name: &'_ str, index: i32) -> &'a [f32] {
-        self.0
-            .aquifer_item(summary_idx, name, index)
-            .unwrap_or_default()
-    }
-
-    pub fn block_item<'a>(&'a self, summary_idx: usize, name: &'_ str, index: i32) -> &'a [f32] {
-        self.0
-            .block_item(summary_idx, name, index)
-            .unwrap_or_default()
-    }
-
-    pub fn well_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        well_name: &'_ str,
-    ) -> &[f32] {
-        self.0
-            .well_item(summary_idx, name, well_name)
-            .unwrap_or_default()
-    }
-
-    pub fn group_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        group_name: &'_ str,
-    ) -> &'a [f32] {
-        self.0
-            .group_item(summary_idx, name, group_name)
-            .unwrap_or_default()
-    }
-
-    pub fn region_item<'a>(&'a self, summary_idx: usize, name: &'_ str, index: i32) -> &'a [f32] {
-        self.0
-            .region_item(summary_idx, name, index)
-            .unwrap_or_default()
-    }
-
-    pub fn cross_region_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        index: i32,
-    ) -> &'a [f32] {
-        let to = index / 32768 as i32 - 10;
-        let from = index - 32768 * (to + 10);
-        self.0
-            .cross_region_item(summary_idx, name, from, to)
-            .unwrap_or_default()
-    }
-
-    pub fn completion_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        well_name: &'_ str,
-        index: i32,
-    ) -> &'a [f32] {
-        self.0
-            .completion_item(summary_idx, name, well_name, index)
-            .unwrap_or_default()
-    }
 }
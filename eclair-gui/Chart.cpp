@@ -7,7 +7,10 @@
 #include <Mahi/Util.hpp>
 #include <implot_internal.h>
 
+#include <algorithm>
+#include <cmath>
 #include <string>
+#include <utility>
 
 using namespace mahi::gui;
 using namespace mahi::util;
@@ -19,7 +22,9 @@ void Chart::reset() {
     axis.fill(-1);
   }
   y_labels.fill("");
+  clear_downsampled();
   needs_refit = true;
+  names_dirty = true;
 }
 
 bool Chart::is_empty() {
@@ -35,6 +40,15 @@ bool Chart::is_empty() {
 
 bool Chart::add_item_to_axis(int item_index, int axis, bool append) {
   auto &axis_items = item_ids[axis];
+  // Dropping an item where it is already plotted changes nothing, so skip the
+  // refit and the label and cache rebuilds that come with any change.
+  bool on_axis = std::find(std::begin(axis_items), std::end(axis_items),
+                           item_index) != std::end(axis_items);
+  if (on_axis &&
+      (append || std::count(std::begin(axis_items), std::end(axis_items),
+                            -1) == N_ITEMS - 1)) {
+    return false;
+  }
   auto non_empty_it =
       std::find_if_not(std::begin(axis_items), std::end(axis_items),
                        [](auto &el) { return el == -1; });
@@ -42,7 +56,8 @@ bool Chart::add_item_to_axis(int item_index, int axis, bool append) {
     auto empty_it = std::find(std::begin(axis_items), std::end(axis_items), -1);
     if (empty_it != std::end(axis_items) &&
         data_manager.names_equal(item_index, *non_empty_it)) {
-      *empty_it = item_index;
+      set_item(axis, static_cast<int>(empty_it - std::begin(axis_items)),
+               item_index);
       // If we could successfully append an item, we need tos change the
       // y-label.
       y_labels[axis] = data_manager.item_name(item_index);
@@ -51,7 +66,7 @@ bool Chart::add_item_to_axis(int item_index, int axis, bool append) {
     }
     return false;
   } else {
-    axis_items[0] = item_index;
+    set_item(axis, 0, item_index);
     for (int i = 1; i < N_ITEMS; ++i) {
       axis_items[i] = -1;
     }
@@ -61,26 +76,86 @@ bool Chart::add_item_to_axis(int item_index, int axis, bool append) {
   }
 }
 
-void Chart::refresh_axes_labels_and_limits() {
-  int empty_count = 0;
+void Chart::set_item(int axis, int slot, int item_index) {
+  item_ids[axis][slot] = item_index;
+  item_keys[axis][slot] = data_manager.item(item_index);
+  downsampled[axis][slot].clear();
+  names_dirty = true;
+}
+
+void Chart::sync_item_ids() {
+  if (item_ids_version == data_manager.item_ids_version()) {
+    return;
+  }
+  for (int i = 0; i < N_AXES; ++i) {
+    for (int j = 0; j < N_ITEMS; ++j) {
+      if (item_ids[i][j] != -1) {
+        // The item is dropped if none of the sources provides it anymore.
+        item_ids[i][j] = data_manager.find_item(item_keys[i][j]);
+      }
+    }
+  }
+  item_ids_version = data_manager.item_ids_version();
+  // Sources may have been removed or added, and a new source's data can reuse
+  // the addresses the cached traces were keyed on.
+  clear_downsampled();
+  names_dirty = true;
+}
+
+void Chart::clear_downsampled() {
+  for (auto &axis : downsampled) {
+    for (auto &traces : axis) {
+      traces.clear();
+    }
+  }
+}
+
+void Chart::refresh_axes_labels() {
   for (int i = 0; i < N_AXES; ++i) {
     auto &axis = item_ids[i];
     auto n_empty_items = std::count(std::begin(axis), std::end(axis), -1);
     if (n_empty_items == N_ITEMS) {
       y_labels[i] = "";
-      ImPlot::SetNextPlotLimitsY(0, 1, ImGuiCond_Always, i);
-      empty_count++;
     } else if (n_empty_items == N_ITEMS - 1) {
       auto it = std::find_if_not(std::begin(axis), std::end(axis),
                                  [](auto &el) { return el == -1; });
       y_labels[i] = data_manager.item_name_and_location(*it);
     }
   }
+}
+
+void Chart::refresh_axes_limits() {
+  int empty_count = 0;
+  for (int i = 0; i < N_AXES; ++i) {
+    auto &axis = item_ids[i];
+    auto n_empty_items = std::count(std::begin(axis), std::end(axis), -1);
+    if (n_empty_items == N_ITEMS) {
+      ImPlot::SetNextPlotLimitsY(0, 1, ImGuiCond_Always, i);
+      empty_count++;
+    }
+  }
   if (empty_count == N_AXES) {
     ImPlot::SetNextPlotLimitsX(0, 1, ImGuiCond_Always);
   }
 }
 
+void Chart::refresh_item_names() {
+  const size_t n_summaries = data_manager.size();
+  for (int i = 0; i < N_AXES; ++i) {
+    for (int j = 0; j < N_ITEMS; ++j) {
+      auto &names = item_names[i][j];
+      names.clear();
+      if (item_ids[i][j] != -1) {
+        for (int s = 0; s < n_summaries; ++s) {
+          names.push_back(data_manager.item_full_name(s, item_ids[i][j]));
+        }
+      }
+    }
+  }
+  n_named_summaries = n_summaries;
+  names_dirty = false;
+}
+
 template <typename T> size_t binary_search(const T *arr, int count, T x) {
   size_t x_lo = 0, x_hi = count - 1;
 
@@ -152,17 +227,102 @@ template <typename T> size_t binary_search(const T *arr, int count, T x) {
 //  ImGui::EndTooltip();
 //}
 
+// A contiguous run of points of a single trace.
+struct PointRange {
+  const double *x;
+  const float *y;
+};
+
 ImPlotPoint ToPoint(void *data, int idx) {
-  auto *pd = (DataManager::PlotData *)data;
-  return {static_cast<double>(pd->x[idx]), pd->y[idx]};
+  auto *range = (PointRange *)data;
+  return {range->x[idx], range->y[idx]};
+}
+
+// Points of a trace that fall inside [x_min, x_max], plus one point on each
+// side so that the segments crossing the plot edges are still drawn.
+std::pair<size_t, size_t> visible_points(const double *x, size_t n,
+                                         double x_min, double x_max) {
+  auto first = std::lower_bound(x, x + n, x_min);
+  auto last = std::upper_bound(first, x + n, x_max);
+  if (first != x) {
+    --first;
+  }
+  if (last != x + n) {
+    ++last;
+  }
+  return {first - x, last - x};
+}
+
+// Largest-Triangle-Three-Buckets downsampling of n points to n_out points. The
+// first and the last points are always kept; every bucket in between
+// contributes the point that forms the largest triangle with the point picked
+// from the previous bucket and the average of the next one.
+void lttb(const double *x, const float *y, size_t n, size_t n_out,
+          std::vector<double> &xs, std::vector<double> &ys) {
+  xs.clear();
+  ys.clear();
+  if (n_out < 3 || n_out >= n) {
+    xs.assign(x, x + n);
+    ys.assign(y, y + n);
+    return;
+  }
+  xs.reserve(n_out);
+  ys.reserve(n_out);
+
+  const double bucket_size = static_cast<double>(n - 2) / (n_out - 2);
+  size_t a = 0;
+  xs.push_back(x[a]);
+  ys.push_back(y[a]);
+  for (size_t i = 0; i < n_out - 2; ++i) {
+    auto avg_first = static_cast<size_t>((i + 1) * bucket_size) + 1;
+    auto avg_last =
+        std::min(static_cast<size_t>((i + 2) * bucket_size) + 1, n);
+    double avg_x = 0.0;
+    double avg_y = 0.0;
+    for (size_t j = avg_first; j < avg_last; ++j) {
+      avg_x += x[j];
+      avg_y += y[j];
+    }
+    avg_x /= static_cast<double>(avg_last - avg_first);
+    avg_y /= static_cast<double>(avg_last - avg_first);
+
+    auto bucket_first = static_cast<size_t>(i * bucket_size) + 1;
+    auto bucket_last = static_cast<size_t>((i + 1) * bucket_size) + 1;
+    double max_area = -1.0;
+    size_t next = bucket_first;
+    for (size_t j = bucket_first; j < bucket_last; ++j) {
+      double area = std::abs((x[a] - avg_x) * (y[j] - y[a]) -
+                             (x[a] - x[j]) * (avg_y - y[a]));
+      if (area > max_area) {
+        max_area = area;
+        next = j;
+      }
+    }
+    xs.push_back(x[next]);
+    ys.push_back(y[next]);
+    a = next;
+  }
+  xs.push_back(x[n - 1]);
+  ys.push_back(y[n - 1]);
 }
 
 void Chart::draw() {
   if (!is_empty() && data_manager.empty()) {
     reset();
   }
+  sync_item_ids();
+
+  // The number of sources is queried from the backend once per frame rather
+  // than for every trace.
+  const size_t n_summaries = data_manager.size();
 
-  refresh_axes_labels_and_limits();
+  // Axis labels and legend names are only rebuilt when the plotted items or the
+  // sources change rather than on every frame.
+  if (names_dirty || n_named_summaries != n_summaries) {
+    refresh_axes_labels();
+    refresh_item_names();
+  }
+  refresh_axes_limits();
   if (needs_refit) {
     ImPlot::FitNextPlotAxes(true, true, true, false);
   }
@@ -190,32 +350,79 @@ void Chart::draw() {
     if (!empty) {
       bool deleted_smth = false;
       int counter = 0;
+      // Work that does not depend on an individual trace is done once per
+      // frame or per axis rather than inside the innermost loop.
+      const bool d_pressed = ImGui::GetIO().KeysDown[GLFW_KEY_D];
+      // Only the points within the current x range are handed to ImPlot,
+      // unless it needs all of them to fit the axes this frame.
+      const bool fit = ImPlot::FitThisFrame();
+      const auto x_limits = ImPlot::GetPlotLimits().X;
+      // There is no point in drawing more than about one point per pixel.
+      const auto n_pixels = static_cast<size_t>(ImPlot::GetPlotSize().x);
       for (int i = 0; i < N_AXES; ++i) {
         auto &axis = item_ids[i];
-        for (auto &id : axis) {
-          for (int s = 0; s < data_manager.size(); ++s) {
-            if (id != -1) {
-              const auto &name = data_manager.item_full_name(s, id);
-              auto pd = data_manager.plot_data(s, id);
-              if (!pd.y.empty()) {
-                ImPlot::SetPlotYAxis(i);
-                auto col = ImPlot::GetColormapColor(counter);
-                counter += 1;
-                ImPlot::PushStyleColor(ImPlotCol_Line, col);
-                ImPlot::PlotLineG(name.c_str(), ToPoint, &pd, pd.x.size());
-                ImPlot::PopStyleColor();
+        ImPlot::SetPlotYAxis(i);
+        for (int j = 0; j < N_ITEMS; ++j) {
+          auto &id = axis[j];
+          if (id == -1) {
+            continue;
+          }
+          for (int s = 0; s < n_summaries; ++s) {
+            const auto &name = item_names[i][j][s];
+            auto pd = data_manager.plot_data(s, id);
+            if (!pd.y.empty()) {
+              // Style only the next item instead of pushing and popping the
+              // global style stack around every trace.
+              ImPlot::SetNextLineStyle(ImPlot::GetColormapColor(counter));
+              counter += 1;
+              // Traces hidden from the legend are still submitted to keep
+              // their entry, but without any points to range or downsample.
+              const auto *item = ImPlot::GetItem(name.c_str());
+              std::pair<size_t, size_t> points{0, 0};
+              if (item == nullptr || item->Show) {
+                points = fit ? std::pair<size_t, size_t>{0, pd.y.size()}
+                             : visible_points(pd.x.data(), pd.y.size(),
+                                              x_limits.Min, x_limits.Max);
               }
-              if (ImPlot::IsLegendEntryHovered(name.c_str()) &&
-                  ImGui::GetIO().KeysDown[GLFW_KEY_D] && was_d_released) {
-                was_d_released = false;
-                id = -1;
-                deleted_smth = true;
+              auto [first, last] = points;
+              if (fit || last - first <= n_pixels) {
+                // Axes are fitted to the exact data rather than to a subset.
+                PointRange range{pd.x.data() + first, pd.y.data() + first};
+                ImPlot::PlotLineG(name.c_str(), ToPoint, &range,
+                                  static_cast<int>(last - first));
+              } else {
+                auto &traces = downsampled[i][j];
+                if (traces.size() != n_summaries) {
+                  traces.resize(n_summaries);
+                }
+                auto &ds = traces[s];
+                if (ds.x != pd.x.data() || ds.y != pd.y.data() ||
+                    ds.first != first || ds.last != last ||
+                    ds.n_out != n_pixels) {
+                  lttb(pd.x.data() + first, pd.y.data() + first, last - first,
+                       n_pixels, ds.xs, ds.ys);
+                  ds.x = pd.x.data();
+                  ds.y = pd.y.data();
+                  ds.first = first;
+                  ds.last = last;
+                  ds.n_out = n_pixels;
+                }
+                ImPlot::PlotLine(name.c_str(), ds.xs.data(), ds.ys.data(),
+                                 static_cast<int>(ds.xs.size()));
               }
             }
+            if (d_pressed && was_d_released &&
+                ImPlot::IsLegendEntryHovered(name.c_str())) {
+              was_d_released = false;
+              id = -1;
+              deleted_smth = true;
+              break;
+            }
           }
         }
       }
       needs_refit = deleted_smth;
+      names_dirty = names_dirty || deleted_smth;
       // custom tooltip
       //      if (tooltip && ImPlot::IsPlotHovered()) {
       //        draw_plot_tooltip(time, data);
@@ -227,14 +434,18 @@ void Chart::draw() {
       if (const ImGuiPayload *payload =
               ImGui::AcceptDragDropPayload("DND_PLOT")) {
         bool append = ImGui::GetIO().KeyCtrl;
-        int i = *(int *)payload->Data;
-        int destination = 0;
-        // set specific y-axis if hovered
-        for (int y = 0; y < N_AXES; y++) {
-          if (ImPlot::IsPlotYAxisHovered(y))
-            destination = y;
+        const auto &item = *(const DataManager::ItemPayload *)payload->Data;
+        // Sources may have been added or removed while the item was dragged,
+        // in which case its index refers to a stale item list.
+        if (item.item_ids_version == data_manager.item_ids_version()) {
+          int destination = 0;
+          // set specific y-axis if hovered
+          for (int y = 0; y < N_AXES; y++) {
+            if (ImPlot::IsPlotYAxisHovered(y))
+              destination = y;
+          }
+          add_item_to_axis(item.index, destination, append);
         }
-        add_item_to_axis(i, destination, append);
       }
       ImGui::EndDragDropTarget();
     }
@@ -30,7 +30,22 @@ private:
 
   bool add_item_to_axis(int item_index, int axis, bool append);
 
-  void refresh_axes_labels_and_limits();
+  // Put an item into an axis slot.
+  void set_item(int axis, int slot, int item_index);
+
+  // Re-resolve the plotted items if the data manager's item list has changed
+  // since they were added.
+  void sync_item_ids();
+
+  // Drop the downsampled points of all traces.
+  void clear_downsampled();
+
+  void refresh_axes_labels();
+
+  void refresh_axes_limits();
+
+  // Rebuild the cached legend names of all items on the chart.
+  void refresh_item_names();
 
   DataManager &data_manager;
 
@@ -43,12 +58,38 @@ private:
   // y labels
   std::array<std::string, N_AXES> y_labels{};
 
-  // item names
+  // item names, one per summary source
   AxesCollection<std::vector<std::string>> item_names;
 
+  // Downsampled points of a single trace together with the data and the point
+  // range they were computed from.
+  struct Downsampled {
+    const double *x = nullptr;
+    const float *y = nullptr;
+    size_t first = 0;
+    size_t last = 0;
+    size_t n_out = 0;
+    std::vector<double> xs;
+    std::vector<double> ys;
+  };
+
+  // Reused while neither the data nor the visible range of a trace change,
+  // one per summary source.
+  AxesCollection<std::vector<Downsampled>> downsampled;
+
+  // Number of summary sources the item names were built for.
+  size_t n_named_summaries = 0;
+
+  bool names_dirty = true;
+
   // There are 2 axes per chart and at most 4 items per axis.
   AxesCollection<int> item_ids{};
 
+  // Identifiers of the plotted items, used to find them again when the item
+  // list changes, and the item list version the indices above refer to.
+  AxesCollection<ItemId> item_keys{};
+  size_t item_ids_version = 0;
+
   bool tooltip = true;
 
   bool needs_refit = true;
@@ -1,9 +1,9 @@
 #include "DataManager.h"
-#include "FilteredVector.h"
 
 #include <Mahi/Gui.hpp>
 #include <Mahi/Util.hpp>
 
+#include <algorithm>
 #include <sstream>
 
 using namespace mahi::gui;
@@ -12,39 +12,12 @@ using namespace mahi::util;
 namespace eclair {
 DataManager::PlotData DataManager::plot_data(size_t summary_index,
                                              int index) const {
-  auto time = manager->timestamps(summary_index);
-  const auto &item_id = item_ids[index];
-  switch (item_id.qualifier) {
-  case ItemQualifier::Time:
-    return {time, manager->time_item(summary_index, item_id.name)};
-  case ItemQualifier::Performance:
-    return {time, manager->performance_item(summary_index, item_id.name)};
-  case ItemQualifier::Field:
-    return {time, manager->field_item(summary_index, item_id.name)};
-  case ItemQualifier::Aquifer:
-    return {time,
-            manager->aquifer_item(summary_index, item_id.name, item_id.index)};
-  case ItemQualifier::Region:
-    return {time,
-            manager->region_item(summary_index, item_id.name, item_id.index)};
-  case ItemQualifier::CrossRegionFlow:
-    return {time, manager->cross_region_item(summary_index, item_id.name,
-                                             item_id.index)};
-  case ItemQualifier::Well:
-    return {time,
-            manager->well_item(summary_index, item_id.name, item_id.wg_name)};
-  case ItemQualifier::Completion:
-    return {time, manager->completion_item(summary_index, item_id.name,
-                                           item_id.wg_name, item_id.index)};
-  case ItemQualifier::Group:
-    return {time,
-            manager->group_item(summary_index, item_id.name, item_id.wg_name)};
-  case ItemQualifier::Block:
-    return {time,
-            manager->block_item(summary_index, item_id.name, item_id.index)};
-  case ItemQualifier::Unrecognized:
-    throw std::runtime_error("Why would you wanna do this?");
+  const auto &time = timestamps[time_source[summary_index]];
+  auto position = item_positions[summary_index * item_ids.size() + index];
+  if (position == -1) {
+    return {time, {}};
   }
+  return {time, manager->item_values(summary_index, position)};
 }
 
 std::string_view DataManager::item_name(int index) const {
@@ -108,17 +81,106 @@ std::string DataManager::item_full_name(int summary_index, int index) const {
   return oss.str();
 }
 
+int DataManager::find_item(const ItemId &item_id) const {
+  // The item list comes sorted from the backend.
+  auto it = std::lower_bound(item_ids.begin(), item_ids.end(), item_id);
+  if (it == item_ids.end() || *it != item_id) {
+    return -1;
+  }
+  return static_cast<int>(it - item_ids.begin());
+}
+
 bool DataManager::names_equal(int index1, int index2) const {
   return item_ids[index1].name == item_ids[index2].name;
 }
 
-// Refresh the time data.
-bool DataManager::refresh() { return manager->refresh(); }
+// Add the sources that finished loading and refresh the time data.
+bool DataManager::refresh() {
+  auto n_sources = manager->length();
+  bool has_new_values = manager->refresh();
+  if (manager->length() != n_sources) {
+    // This also refreshes the timestamps.
+    refresh_item_ids();
+    return true;
+  }
+  if (has_new_values) {
+    refresh_timestamps(false);
+  }
+  return has_new_values;
+}
+
+void DataManager::refresh_timestamps(bool find_shared) {
+  timestamps.resize(manager->length());
+  time_source.resize(manager->length());
+  n_shared.resize(manager->length());
+  for (size_t s = 0; s < timestamps.size(); ++s) {
+    auto ts = manager->timestamps(s);
+
+    if (find_shared) {
+      // Sources of an ensemble usually share their time steps. Those reuse the
+      // converted timestamps of the first source whose steps start with the
+      // same ones.
+      time_source[s] = s;
+      for (size_t t = 0; t < s; ++t) {
+        if (time_source[t] != t) {
+          continue;
+        }
+        auto other = manager->timestamps(t);
+        if (ts.size() <= other.size() &&
+            std::equal(ts.begin(), ts.end(), other.begin())) {
+          time_source[s] = t;
+          break;
+        }
+      }
+      n_shared[s] = ts.size();
+    } else if (time_source[s] != s) {
+      // Only the steps that arrived since the last refresh are compared. A
+      // source that runs ahead of or away from the one it shares with keeps
+      // its own timestamps until the item list is rebuilt.
+      auto other = manager->timestamps(time_source[s]);
+      if (ts.size() > other.size() ||
+          !std::equal(ts.begin() + n_shared[s], ts.end(),
+                      other.begin() + n_shared[s])) {
+        time_source[s] = s;
+      } else {
+        n_shared[s] = ts.size();
+      }
+    }
+
+    auto &cached = timestamps[s];
+    if (time_source[s] != s) {
+      cached = {};
+      continue;
+    }
+    // Timestamps are only ever appended, so only the tail needs converting. A
+    // range insert sizes the vector once and converts in a single loop.
+    cached.insert(cached.end(), ts.begin() + cached.size(), ts.end());
+  }
+}
+
+void DataManager::refresh_row_labels() {
+  // Labels only depend on the row index, so existing ones are kept.
+  row_labels.reserve(item_ids.size());
+  for (size_t i = row_labels.size(); i < item_ids.size(); ++i) {
+    row_labels.push_back(std::to_string(i));
+  }
+
+  index_labels.clear();
+  index_labels.reserve(item_ids.size());
+  for (const auto &item_id : item_ids) {
+    index_labels.push_back(
+        item_id.index == -1 ? "" : fmt::format("{}", item_id.index));
+  }
+}
 
 void DataManager::draw() {
   // Draw the "Sources" first. Sources can be removed, that's why we don't draw
   // the "Items" table in the same if statement.
   int to_be_removed = -1;
+  if (auto n_loading = manager->n_loading(); n_loading > 0) {
+    ImGui::Text("Loading %zu file%s...", n_loading, n_loading == 1 ? "" : "s");
+  }
+
   if (!empty()) {
     if (ImGui::CollapsingHeader("Sources", ImGuiTreeNodeFlags_DefaultOpen)) {
       for (int i = 0; i < manager->length(); i++) {
@@ -134,7 +196,9 @@ void DataManager::draw() {
 
     if (to_be_removed != -1) {
       manager->remove(to_be_removed);
-      item_ids = manager->all_item_ids();
+      // Only the cached values are erased, the time sources are rebuilt below.
+      timestamps.erase(timestamps.begin() + to_be_removed);
+      refresh_item_ids();
     }
   }
 
@@ -160,17 +224,24 @@ void DataManager::draw() {
               column); // Retrieve name passed to TableSetupColumn()
           ImGui::PushID(column);
           ImGui::TableHeader(column_name);
-          if (column > 0) {
-            filters[column - 1]->Draw("##items_filter",
-                                      ImGui::GetContentRegionAvail().x);
+          if (column > 0 &&
+              filters[column - 1]->Draw("##items_filter",
+                                        ImGui::GetContentRegionAvail().x)) {
+            last_filter_edit = ImGui::GetTime();
           }
           ImGui::PopID();
         }
 
         // data rows
-        FilteredVector filtered_items(item_ids, [this](auto &&item) -> bool {
-          return filter(std::forward<decltype(item)>(item));
-        });
+        if (last_filter_edit >= 0.0 &&
+            ImGui::GetTime() - last_filter_edit >= FILTER_DEBOUNCE_TIME) {
+          last_filter_edit = -1.0;
+          filters_changed = true;
+        }
+        if (filters_changed) {
+          filtered_items.update([this](size_t i) { return filter(i); });
+          filters_changed = false;
+        }
 
         int selection = -1;
         ImGuiListClipper clipper;
@@ -184,14 +255,15 @@ void DataManager::draw() {
 
             ImGui::TableNextRow();
             ImGui::TableNextColumn();
-            std::string label = std::to_string(real_row);
+            const auto &label = row_labels[real_row];
             if (ImGui::Selectable(label.c_str(), item_is_selected,
                                   ImGuiSelectableFlags_SpanAllColumns,
                                   ImVec2(0, 0))) {
               selection = real_row;
             }
             if (ImGui::BeginDragDropSource(ImGuiDragDropFlags_None)) {
-              ImGui::SetDragDropPayload("DND_PLOT", &real_row, sizeof(int));
+              ItemPayload payload{ids_version, real_row};
+              ImGui::SetDragDropPayload("DND_PLOT", &payload, sizeof(payload));
               ImGui::TextUnformatted(label.c_str());
               ImGui::EndDragDropSource();
             }
@@ -215,20 +287,16 @@ void DataManager::draw() {
   }
 }
 
-bool DataManager::filter(const ItemId &item_id) const {
-  bool pass_name_filter = name_filter.PassFilter(
-      item_id.name.data(), item_id.name.data() + item_id.name.size());
-
-  bool pass_wg_filter = wg_filter.PassFilter(
-      item_id.wg_name.data(), item_id.wg_name.data() + item_id.wg_name.size());
-
-  std::string idx_str =
-      (item_id.index == -1) ? "" : fmt::format("{}", item_id.index);
-
-  bool pass_idx_filter =
-      idx_filter.PassFilter(idx_str.data(), idx_str.data() + idx_str.size());
-
-  return pass_name_filter && pass_wg_filter && pass_idx_filter;
+bool DataManager::filter(size_t index) const {
+  const auto &item_id = item_ids[index];
+  const auto &idx_str = index_labels[index];
+  // The remaining filters are skipped as soon as one of them fails.
+  return name_filter.PassFilter(item_id.name.data(),
+                                item_id.name.data() + item_id.name.size()) &&
+         wg_filter.PassFilter(item_id.wg_name.data(),
+                              item_id.wg_name.data() +
+                                  item_id.wg_name.size()) &&
+         idx_filter.PassFilter(idx_str.data(), idx_str.data() + idx_str.size());
 }
 
 } // namespace eclair
\ No newline at end of file
@@ -2,9 +2,12 @@
 #define ECLAIR_GUI_DATAMANAGER_H
 
 #include <cassert>
+#include "FilteredVector.h"
 #include "eclair_ffi.rs.h"
 #include <imgui.h>
 
+#include <string>
+#include <utility>
 #include <vector>
 
 namespace eclair {
@@ -14,8 +17,10 @@ public:
 
   void draw();
 
+  // The x values can outnumber the y values, only the first y.size() of them
+  // belong to the trace.
   struct PlotData {
-    const rust::Slice<const int64_t> x;
+    const std::vector<double> &x;
     const rust::Slice<const float> y;
   };
 
@@ -29,24 +34,44 @@ public:
 
   [[nodiscard]] std::string item_full_name(int summary_index, int index) const;
 
+  [[nodiscard]] const ItemId &item(int index) const { return item_ids[index]; }
+
+  // Index of the item in the current item list or -1 if it is not present.
+  [[nodiscard]] int find_item(const ItemId &item_id) const;
+
+  // Incremented every time the item list is re-pulled from the sources. Item
+  // indices obtained under a different version are no longer valid.
+  [[nodiscard]] size_t item_ids_version() const { return ids_version; }
+
+  // Drag and drop payload of an item. The index is only meaningful under the
+  // item list version it was taken from.
+  struct ItemPayload {
+    size_t item_ids_version;
+    int index;
+  };
+
+  // Files are read in the background, the sources show up once a later
+  // refresh() finds them loaded.
   void add_from_files(const std::string &path) {
-    manager->add_from_files(path, "");
-    item_ids = manager->all_item_ids();
+    add_from_files(std::vector<std::string>{path});
   }
 
   void add_from_files(const std::vector<std::string> &paths) {
+    // The backend reads the files concurrently.
+    rust::Vec<rust::String> input_paths;
+    input_paths.reserve(paths.size());
     for (const auto &path : paths) {
-      manager->add_from_files(path, "");
+      input_paths.push_back(path);
     }
-    item_ids = manager->all_item_ids();
+    manager->add_from_files_in_background(std::move(input_paths));
   }
 
   void add_from_network(const std::string &server, int port) {
     manager->add_from_network(server, port, "eclair", "");
-    item_ids = manager->all_item_ids();
+    refresh_item_ids();
   }
 
-  // Refresh the time data.
+  // Add the sources that finished loading and refresh the time data.
   bool refresh();
 
   [[nodiscard]] bool empty() const { return manager->length() == 0; }
@@ -54,13 +79,65 @@ public:
   [[nodiscard]] size_t size() const { return manager->length(); }
 
 private:
-  [[nodiscard]] ItemId item(int index) const { return item_ids[index]; }
+  // Pull the list of all items from the sources.
+  void refresh_item_ids() {
+    auto list = manager->item_list();
+    item_ids = std::move(list.ids);
+    item_positions = std::move(list.positions);
+    ids_version++;
+    filters_changed = true;
+    refresh_row_labels();
+    refresh_timestamps(true);
+  }
+
+  // Make sure there is a label for every row of the items table and format
+  // the item indices matched by the index filter.
+  void refresh_row_labels();
+
+  // Convert newly arrived timestamps to plot coordinates. Which sources share
+  // their converted timestamps is only worked out from scratch if find_shared
+  // is set, otherwise just the new steps of the sharing sources are checked.
+  void refresh_timestamps(bool find_shared);
 
   // Item filter that combines name, well/group and index filters together.
-  [[nodiscard]] bool filter(const ItemId &item_id) const;
+  [[nodiscard]] bool filter(size_t index) const;
 
   rust::Box<SummaryManager> manager;
   rust::Vec<ItemId> item_ids;
+  size_t ids_version = 0;
+
+  // Where each item is stored in each of the sources, resolved once per item
+  // list rather than looked up by name on every frame. Indexed by
+  // summary_index * item_ids.size() + item index; -1 if a source lacks an item.
+  rust::Vec<int64_t> item_positions;
+
+  // Timestamps of every source converted to doubles once, rather than on every
+  // frame they are plotted.
+  std::vector<std::vector<double>> timestamps;
+
+  // Index of the source whose converted timestamps each source plots against.
+  // A source whose time steps are a prefix of another one's shares its array,
+  // which may thus be longer than the source's values; the timestamps of a
+  // source that uses another one's are left empty.
+  std::vector<size_t> time_source;
+  // Number of time steps of each sharing source already checked against the
+  // source it shares with.
+  std::vector<size_t> n_shared;
+
+  // Items passing the filters. Only recomputed when either the filters or the
+  // items change.
+  FilteredVector<rust::Vec<ItemId>> filtered_items{item_ids};
+  // Row numbers of the items table, formatted once instead of on every frame.
+  std::vector<std::string> row_labels;
+  // Item indices as the index filter sees them, empty for items without one.
+  std::vector<std::string> index_labels;
+  bool filters_changed = true;
+
+  // Edits to the filter text are applied once typing pauses for this many
+  // seconds, so a burst of keystrokes refilters the items only once.
+  static constexpr double FILTER_DEBOUNCE_TIME = 0.1;
+  // Time of the last filter edit that has not been applied yet, or -1.
+  double last_filter_edit = -1.0;
 
   // Data filtering
   ImGuiTextFilter name_filter;
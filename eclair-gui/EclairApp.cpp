@@ -120,6 +120,11 @@ void EclairApp::update() {
   // 24 is the empirical width to avoid scrolling. How do I get it properly?
   float sz2 = ImGui::GetCurrentWindow()->Size.x - sz1 - 24;
   Splitter(true, 2.0f, &sz1, &sz2, 100, 400);
+
+  // Update data. Sources that finished loading change the item list, so this
+  // happens before any item index is handed out for the frame.
+  data_manager.refresh();
+
   ImGui::BeginChild("Data", ImVec2(sz1, -1.0), false);
   data_manager.draw();
   ImGui::EndChild();
@@ -127,9 +132,6 @@ void EclairApp::update() {
   ImGui::BeginChild("Chart", ImVec2(sz2, -1.0), false,
                     ImGuiWindowFlags_NoScrollbar);
 
-  // Update data.
-  data_manager.refresh();
-
   // Then plot it.
   chart.draw();
   ImGui::EndChild();
@@ -1,16 +1,22 @@
 #ifndef ECLAIR_GUI_FILTEREDVECTOR_H
 #define ECLAIR_GUI_FILTEREDVECTOR_H
 
+#include <cstddef>
 #include <vector>
 
 namespace eclair {
 
-// A const view into a vector filtered by a predicate.
-template <typename V, typename Predicate> class FilteredVector {
+// A const view into a vector filtered by a predicate on the element indices.
+// The filtered indices are only recomputed on demand, so the view can be kept
+// around between frames.
+template <typename V> class FilteredVector {
 public:
-  FilteredVector(const V &vec, Predicate p) : vec{vec} {
+  explicit FilteredVector(const V &vec) : vec{vec} {}
+
+  template <typename Predicate> void update(Predicate p) {
+    indices.clear();
     for (size_t i = 0; i < vec.size(); ++i) {
-      if (p(vec[i])) {
+      if (p(i)) {
         indices.push_back(i);
       }
     }
@@ -55,6 +55,9 @@ pub enum EclairError {
     #[error("Invalid file path requested: {0}")]
     InvalidFilePath(String),
 
+    #[error("Reading the summary file {0} panicked")]
+    LoaderPanicked(String),
+
     #[cfg(feature = "read_zmq")]
     #[error("ZeroMQ error")]
     ZeroMqError(#[from] zmq::Error),
@@ -64,8 +67,8 @@ pub enum EclairError {
     ZeroMqSocketDisconnected,
 
     #[cfg(feature = "read_zmq")]
-    #[error("Received Smspec JSON string is not valid UTF-8")]
-    InvalidSmspecJson,
+    #[error("ZeroMQ message does not consist of the expected {0} parts")]
+    ZeroMqUnexpectedParts(usize),
 
     #[cfg(feature = "read_zmq")]
     #[error("JSON deserealization error")]
@@ -50,6 +50,7 @@
 use crate::{binary_parsing as bp, error::EclairError, FlexString, Result, FIXED_STRING_LENGTH};
 
 use std::{
+    cell::RefCell,
     fmt::{Display, Formatter},
     mem, str,
 };
@@ -58,6 +59,12 @@ use std::{
 const NUM_BLOCK_LENGTH: usize = 1000;
 const STR_BLOCK_LENGTH: usize = 105;
 
+thread_local! {
+    /// Scratch space for record sub-blocks. It is grown to the largest block seen so far and then
+    /// reused by every subsequent record read on the same thread.
+    static BLOCK_BUF: RefCell<Vec<u8>> = RefCell::new(Vec::new());
+}
+
 /// A body of data in an Eclipse binary record.
 #[derive(Debug, PartialEq)]
 pub enum RecordData {
@@ -117,46 +124,167 @@ impl RecordData {
     fn push(&mut self, input: &[u8], element_size: usize) {
         // FIXME: How to best validate input bytes before pushing?
         use RecordData::*;
-        input
-            .chunks_exact(element_size)
-            .for_each(|chunk| match self {
-                Int(v) | Bool(v) => v.push(bp::read_i32(chunk)),
-                F32(v) => v.push(bp::read_f32(chunk)),
-                F64(v) => v.push(bp::read_f64(chunk)),
-                Chars(v) => v.push(FlexString::from(
+        // Dispatch on the data type once per block, so that the byte order of a whole block is
+        // converted in a single tight loop.
+        let chunks = input.chunks_exact(element_size);
+        match self {
+            Int(v) | Bool(v) => v.extend(chunks.map(bp::read_i32)),
+            F32(v) => v.extend(chunks.map(bp::read_f32)),
+            F64(v) => v.extend(chunks.map(bp::read_f64)),
+            Chars(v) => v.extend(chunks.map(|chunk| {
+                FlexString::from(
                     str::from_utf8(chunk)
                         .unwrap_or("Utf8 error creating string record")
                         .trim(),
-                )),
-                Message => unimplemented!("Attempted to push into a RecordData::Message instance."),
-            });
+                )
+            })),
+            Message => unimplemented!("Attempted to push into a RecordData::Message instance."),
+        }
+    }
+
+    /// Populate Data instance by streaming the record body from the reader. Use header info to
+    /// infer the number of bytes to read and how to interpret them. Numbers are read straight
+    /// into the record's storage, strings go through a scratch buffer holding a single sub-block,
+    /// so large records never need a body-sized intermediate allocation.
+    fn read_from<R: std::io::Read>(&mut self, header: &Header, reader: &mut R) -> Result<()> {
+        BLOCK_BUF.with(|block_buf| {
+            let mut block_buf = block_buf.borrow_mut();
+            if let RecordData::Chars(_) = self {
+                let max_block_len = std::cmp::min(header.block_length, header.n_elements);
+                if block_buf.len() < max_block_len * header.element_size {
+                    block_buf.resize(max_block_len * header.element_size, 0);
+                }
+            }
+            self.read_blocks(header, reader, &mut block_buf)
+        })
+    }
+
+    /// Read the data of a single sub-block with the given number of elements.
+    fn read_block<R: std::io::Read>(
+        &mut self,
+        n_elements: usize,
+        element_size: usize,
+        reader: &mut R,
+        block_buf: &mut [u8],
+    ) -> Result<()> {
+        use RecordData::*;
+        match self {
+            Int(v) | Bool(v) => read_numbers(v, n_elements, reader),
+            F32(v) => read_numbers(v, n_elements, reader),
+            F64(v) => read_numbers(v, n_elements, reader),
+            _ => {
+                let block_bytes = &mut block_buf[..n_elements * element_size];
+                reader.read_exact(block_bytes)?;
+                self.push(block_bytes, element_size);
+                Ok(())
+            }
+        }
     }
 
-    /// Populate Data instance from the byte slice. Use header info to infer the number of bytes to
-    /// read and how to interpret them. The function will panic if the input slice is not fully
-    /// consumed.
-    fn populate(&mut self, header: &Header, input: &[u8]) -> Result<()> {
-        // keep reading bytes from the input until we collected the requested number of elements
+    /// Read all sub-blocks of the record body using the provided scratch buffer.
+    fn read_blocks<R: std::io::Read>(
+        &mut self,
+        header: &Header,
+        reader: &mut R,
+        block_buf: &mut [u8],
+    ) -> Result<()> {
         let mut n_remaining_elements = header.n_elements;
-        let mut rest = input;
+        let mut marker_buf = [0u8; 4];
 
+        // keep reading blocks until we collected the requested number of elements
         while n_remaining_elements > 0 {
             // read at most the block_length number of elements
             let to_read = std::cmp::min(header.block_length, n_remaining_elements);
-            let (block_bytes, input) = bp::take_block_exact(to_read * header.element_size, rest)?;
+            let size = to_read * header.element_size;
+
+            // head marker
+            reader.read_exact(&mut marker_buf)?;
+            let head = bp::read_i32(&marker_buf);
+            if head as usize != size {
+                return Err(EclairError::RecordByteLengthMismatch {
+                    expected: size,
+                    found: head as usize,
+                });
+            }
+
+            // actual data, added to the constructed instance
+            self.read_block(to_read, header.element_size, reader, block_buf)?;
 
-            // add the current block to the constructed instance
-            self.push(block_bytes, header.element_size);
+            // tail marker
+            reader.read_exact(&mut marker_buf)?;
+            let tail = bp::read_i32(&marker_buf);
+            if head != tail {
+                return Err(EclairError::HeadTailMismatch { head, tail });
+            }
 
             n_remaining_elements -= to_read;
-            rest = input;
         }
-        assert!(rest.is_empty(), "Record body not completely consumed");
 
         Ok(())
     }
 }
 
+mod sealed {
+    /// Numbers that can be filled from raw bytes read from a file.
+    ///
+    /// # Safety
+    ///
+    /// Implementors must have no padding and accept every bit pattern as a valid value. The trait
+    /// is private, so only the implementations below exist.
+    pub unsafe trait BigEndianNumber: Copy + Default {
+        fn from_be(self) -> Self;
+    }
+
+    unsafe impl BigEndianNumber for i32 {
+        fn from_be(self) -> Self {
+            i32::from_be(self)
+        }
+    }
+
+    unsafe impl BigEndianNumber for f32 {
+        fn from_be(self) -> Self {
+            f32::from_bits(u32::from_be(self.to_bits()))
+        }
+    }
+
+    unsafe impl BigEndianNumber for f64 {
+        fn from_be(self) -> Self {
+            f64::from_bits(u64::from_be(self.to_bits()))
+        }
+    }
+}
+
+use sealed::BigEndianNumber;
+
+/// Read `n` big-endian numbers straight into the end of the vector, without an intermediate copy
+/// of their bytes, and convert them to the native byte order in place.
+fn read_numbers<T, R>(values: &mut Vec<T>, n: usize, reader: &mut R) -> Result<()>
+where
+    T: BigEndianNumber,
+    R: std::io::Read,
+{
+    let old_len = values.len();
+    values.resize(old_len + n, T::default());
+    let new_values = &mut values[old_len..];
+
+    // SAFETY: The pointer and the length cover exactly the initialized elements just added, which
+    // are borrowed mutably for the lifetime of `bytes`. `T: BigEndianNumber` guarantees that any
+    // bytes written through it leave every element a valid `T`, and `u8` has no alignment
+    // requirement.
+    let bytes = unsafe {
+        std::slice::from_raw_parts_mut(
+            new_values.as_mut_ptr() as *mut u8,
+            mem::size_of_val(new_values),
+        )
+    };
+    reader.read_exact(bytes)?;
+
+    for value in new_values.iter_mut() {
+        *value = value.from_be();
+    }
+    Ok(())
+}
+
 /// A record's header information necessary to populate the record's body.
 #[derive(Debug, PartialEq)]
 struct Header {
@@ -328,10 +456,7 @@ where
 
         let (header, mut data) = extract_header_info(&header_buf)?;
 
-        let mut body_buf = vec![0u8; header.len_bytes()];
-        self.read_exact(&mut body_buf)?;
-
-        data.populate(&header, &body_buf)?;
+        data.read_from(&header, self)?;
 
         let total_bytes = 24 + header.len_bytes();
 
@@ -381,6 +506,37 @@ mod tests {
         assert!(record.is_none());
     }
 
+    #[test]
+    fn multi_block_floats() {
+        // 1500 REAL values are written as two sub-blocks of 1000 and 500 elements.
+        let values: Vec<f32> = (0..1500).map(|v| v as f32 * 0.5).collect();
+
+        let mut input = Vec::new();
+        input.extend_from_slice(&16i32.to_be_bytes());
+        input.extend_from_slice(b"PARAMS  ");
+        input.extend_from_slice(&1500i32.to_be_bytes());
+        input.extend_from_slice(b"REAL");
+        input.extend_from_slice(&16i32.to_be_bytes());
+        for block in values.chunks(NUM_BLOCK_LENGTH) {
+            let marker = (block.len() * 4) as i32;
+            input.extend_from_slice(&marker.to_be_bytes());
+            block
+                .iter()
+                .for_each(|v| input.extend_from_slice(&v.to_be_bytes()));
+            input.extend_from_slice(&marker.to_be_bytes());
+        }
+
+        let (n_bytes, record) = Cursor::new(input.as_slice()).read_record().unwrap();
+        assert_eq!(n_bytes, input.len());
+        assert_eq!(
+            record.unwrap(),
+            Record {
+                name: FlexString::from("PARAMS"),
+                data: RecordData::F32(values)
+            }
+        );
+    }
+
     #[test]
     fn read_spe_10() {
         let file = File::open("assets/SPE10.SMSPEC").unwrap();
@@ -45,7 +45,7 @@ use std::{
     time,
 };
 
-use chrono::{Duration, NaiveDate, NaiveDateTime, NaiveTime};
+use chrono::{NaiveDate, NaiveDateTime, NaiveTime};
 use crossbeam_channel::{Receiver, Sender};
 use itertools::multizip;
 use once_cell::sync::Lazy;
@@ -86,36 +86,43 @@ static SMSPEC_RECORDS: Lazy<HashSet<&'static str>> = Lazy::new(|| {
     s
 });
 
-static TIMING_KEYWORDS: Lazy<HashSet<&'static str>> = Lazy::new(|| {
-    let mut s = HashSet::new();
-    s.insert("TIME");
-    s.insert("YEARS");
-    s.insert("DAY");
-    s.insert("MONTH");
-    s.insert("YEAR");
-    s
-});
-
-static PERFORMANCE_KEYWORDS: Lazy<HashSet<&'static str>> = Lazy::new(|| {
-    let mut s = HashSet::new();
-    s.insert("ELAPSED");
-    s.insert("MLINEARS");
-    s.insert("MSUMLINS");
-    s.insert("MSUMNEWT");
-    s.insert("NEWTON");
-    s.insert("NLINEARS");
-    s.insert("TCPU");
-    s.insert("TCPUDAY");
-    s.insert("TCPUTS");
-    s.insert("TIMESTEP");
-    s.insert("MEMGB");
-    s.insert("MAXMEMGB");
-    s.insert("NAIMFRAC");
-    s
+/// Summary items whose qualifier is fully determined by the item name, so that classifying an
+/// SMSPEC entry takes a single hash lookup before falling back to the mnemonic prefix rules.
+static KEYWORD_QUALIFIERS: Lazy<HashMap<&'static str, ItemQualifier>> = Lazy::new(|| {
+    use ItemQualifier::*;
+
+    let mut m = HashMap::new();
+    // Timing keywords
+    m.insert("TIME", Time);
+    m.insert("YEARS", Time);
+    m.insert("DAY", Time);
+    m.insert("MONTH", Time);
+    m.insert("YEAR", Time);
+    // Performance keywords
+    m.insert("ELAPSED", Performance);
+    m.insert("MLINEARS", Performance);
+    m.insert("MSUMLINS", Performance);
+    m.insert("MSUMNEWT", Performance);
+    m.insert("NEWTON", Performance);
+    m.insert("NLINEARS", Performance);
+    m.insert("TCPU", Performance);
+    m.insert("TCPUDAY", Performance);
+    m.insert("TCPUTS", Performance);
+    m.insert("TIMESTEP", Performance);
+    m.insert("MEMGB", Performance);
+    m.insert("MAXMEMGB", Performance);
+    m.insert("NAIMFRAC", Performance);
+    m
 });
 
 const UNKNOWN_WG_NAME: &str = ":+:+:+:+";
 
+/// Largest capacity of the buffered readers wrapping SMSPEC and UNSMRY files during the initial
+/// load. Summary files are read front to back in one go, so a large buffer cuts the number of read
+/// syscalls compared to the 8 KiB `BufReader` default. Smaller files get a buffer of their own
+/// size, and the updater goes back to the default once the initial load is done.
+const FILE_BUFFER_CAPACITY: usize = 1 << 20;
+
 /// ItemId is an item identifier derived from the SMSPEC metadata. It consists of a name, which
 /// corresponds to the physical quantity the item represents (e.g. WBHP for the well bottom hole
 /// pressure) and a qualifier, which roughly corresponds to the location (e.g. well named WELL_1).
@@ -135,10 +142,8 @@ impl ItemId {
         let wg_valid = !wg_name.is_empty() && wg_name != UNKNOWN_WG_NAME;
         let num_valid = index > 0;
 
-        let qualifier = if TIMING_KEYWORDS.contains(name.as_str()) {
-            Time
-        } else if PERFORMANCE_KEYWORDS.contains(name.as_str()) {
-            Performance
+        let qualifier = if let Some(qualifier) = KEYWORD_QUALIFIERS.get(name.as_str()) {
+            qualifier.clone()
         } else {
             match name.as_bytes() {
                 [b'F', ..] => Field,
@@ -160,7 +165,7 @@ impl ItemId {
                 [b'G', ..] if wg_valid => Group { wg_name },
                 [b'B', ..] if num_valid => Block { index },
                 _ => {
-                    log::info!(target: "Building SummaryItem",
+                    log::debug!(target: "Building SummaryItem",
                                "Unrecognized summary item. KEYWORD: {}, WGNAME: {}, NUM: {}",
                                name, wg_name, index
                     );
@@ -173,7 +178,7 @@ impl ItemId {
 }
 
 /// ItemQualifier is used to associate a location or a category with a summary item.
-#[derive(Debug, Eq, Hash, PartialEq)]
+#[derive(Clone, Debug, Eq, Hash, PartialEq)]
 pub enum ItemQualifier {
     Time,
     Performance,
@@ -270,7 +275,8 @@ pub struct Summary {
     // Index of the time item.
     time_index: usize,
 
-    start_timestamp: i64,
+    // Unix time of the simulation start in seconds, including the fractional part.
+    start_timestamp: f64,
 }
 
 impl Summary {
@@ -287,12 +293,24 @@ impl Summary {
         }
     }
 
+    /// Reserve capacity for at least `additional` more time steps, so that appending them does
+    /// not reallocate every item's values one by one.
+    pub fn reserve(&mut self, additional: usize) {
+        self.timestamps.reserve(additional);
+        for item in &mut self.items {
+            item.values.reserve(additional);
+        }
+    }
+
     /// This function expects the size of params to equal the size of items.
     pub fn append(&mut self, params: Vec<f32>) {
-        let new_time = params[self.time_index];
-        let new_ts =
-            self.start_timestamp + Duration::seconds((new_time * 86400.0) as i64).num_seconds();
-        self.timestamps.push(new_ts);
+        // TIME is measured in days since the simulation start.
+        // It is stored as f32, but seconds have to be computed in f64: a decade is more seconds
+        // than f32 can represent exactly.
+        // The sum is rounded as a whole, so that a fractional start second is not lost.
+        let new_time = f64::from(params[self.time_index]);
+        self.timestamps
+            .push((self.start_timestamp + new_time * 86400.0).round() as i64);
 
         for (item, param) in self.items.iter_mut().zip(params) {
             item.values.push(param);
@@ -397,25 +415,16 @@ impl TryFrom<SmspecRecords> for Summary {
         // Now we prepare to construct the Summary object.
         let dims = dimens[1..4].try_into().unwrap();
 
-        let d = NaiveDate::from_ymd(start_dat[2], start_dat[1] as u32, start_dat[0] as u32);
-
-        let ts = if start_dat.len() == 3 {
-            d.and_hms(0, 0, 0)
-        } else {
-            d.and_hms_milli(
-                start_dat[3] as u32,
-                start_dat[4] as u32,
-                (start_dat[5] / 1_000_000) as u32,
-                (start_dat[5] % 1_000_000) as u32,
-            )
-        };
-
-        let mut item_ids = HashMap::new();
+        let mut item_ids = HashMap::with_capacity(nlist);
         let mut items = Vec::with_capacity(nlist);
 
+        let mut n_unrecognized = 0;
         for vals in multizip((keywords, wg_names, nums, units)) {
             let (name, wg_name, index, unit) = vals;
             let item_id = ItemId::new(name, wg_name, index);
+            if !item_id.qualifier.is_recognized() {
+                n_unrecognized += 1;
+            }
             item_ids.insert(item_id, items.len());
             items.push(SummaryItem {
                 unit,
@@ -423,6 +432,12 @@ impl TryFrom<SmspecRecords> for Summary {
             });
         }
 
+        // Individual unrecognized items are only logged at the debug level, a model can have
+        // thousands of them.
+        if n_unrecognized > 0 {
+            log::info!(target: "Building SummaryItem", "Unrecognized summary items: {}", n_unrecognized);
+        }
+
         // We will panic if there is no "TIME" in the data. Make this an error instead.
         let time_index = *item_ids
             .get(&ItemId {
@@ -437,11 +452,33 @@ impl TryFrom<SmspecRecords> for Summary {
             item_ids,
             items,
             time_index,
-            start_timestamp: ts.timestamp(),
+            start_timestamp: timestamp_secs(&start_date(&start_dat)),
         })
     }
 }
 
+/// Unix time in seconds with microsecond precision.
+fn timestamp_secs(date_time: &NaiveDateTime) -> f64 {
+    date_time.timestamp() as f64 + f64::from(date_time.timestamp_subsec_micros()) * 1e-6
+}
+
+/// Decode the simulation start from the STARTDAT values: day, month, year and optionally hour,
+/// minute and microsecond, the latter including the whole seconds.
+fn start_date(start_dat: &[i32]) -> NaiveDateTime {
+    let d = NaiveDate::from_ymd(start_dat[2], start_dat[1] as u32, start_dat[0] as u32);
+
+    if start_dat.len() == 3 {
+        d.and_hms(0, 0, 0)
+    } else {
+        d.and_hms_micro(
+            start_dat[3] as u32,
+            start_dat[4] as u32,
+            (start_dat[5] / 1_000_000) as u32,
+            (start_dat[5] % 1_000_000) as u32,
+        )
+    }
+}
+
 /// Implementations of InitializeSummary can build a Summary instance and an object that can be
 /// subsequently used to append more data to it.
 pub trait InitializeSummary {
@@ -473,12 +510,13 @@ pub struct SummaryFileUpdater {
 }
 
 /// Scan the next two or three UNSMRY records and attempt to extract data for the next time
-/// iteration.
+/// iteration. Returns the number of bytes read, the number of those that belong to the MINISTEP
+/// and PARAMS records alone, and the values.
 fn get_next_params<T: ReadRecord>(
     reader: &mut T,
     step: usize,
     n_items: usize,
-) -> Result<Option<(usize, Vec<f32>)>> {
+) -> Result<Option<(usize, usize, Vec<f32>)>> {
     use EclairError::*;
 
     macro_rules! unwrap_and_validate {
@@ -501,16 +539,15 @@ fn get_next_params<T: ReadRecord>(
     // This could be a SEQHDR.
     let read_next = match &record {
         None => return Ok(None),
-        Some(Record { name, .. }) => {
-            n_bytes_read += n_bytes;
-            name == "SEQHDR"
-        }
+        Some(Record { name, .. }) => name == "SEQHDR",
     };
 
+    let mut n_step_bytes = n_bytes;
     if read_next {
+        n_bytes_read += n_bytes;
         let (n_bytes, next_record) = reader.read_record()?;
         record = next_record;
-        n_bytes_read += n_bytes;
+        n_step_bytes = n_bytes;
     }
 
     // Next one should be MINISTEP. The wrapped counter inside starts at 0.
@@ -524,11 +561,12 @@ fn get_next_params<T: ReadRecord>(
     }
 
     let (n_bytes, record) = reader.read_record()?;
-    n_bytes_read += n_bytes;
+    n_step_bytes += n_bytes;
+    n_bytes_read += n_step_bytes;
 
     // Next is PARAMS with as many values as we have items.
     let params = unwrap_and_validate!(record, "PARAMS", F32, n_items);
-    Ok(Some((n_bytes_read, params)))
+    Ok(Some((n_bytes_read, n_step_bytes, params)))
 }
 
 impl UpdateSummary for SummaryFileUpdater {
@@ -559,7 +597,7 @@ impl UpdateSummary for SummaryFileUpdater {
 
                 last_read_successful = match params {
                     Ok(params) => {
-                        if let Some((n_bytes, params)) = params {
+                        if let Some((n_bytes, _, params)) = params {
                             file_pos += n_bytes as u64;
                             self.n_steps += 1;
 
@@ -608,7 +646,11 @@ impl SummaryFileReader {
             }
         }
 
-        let open_file = |path| -> Result<_> { Ok(BufReader::new(File::open(path)?)) };
+        let open_file = |path| -> Result<_> {
+            let file = File::open(path)?;
+            let capacity = (file.metadata()?.len() as usize).min(FILE_BUFFER_CAPACITY);
+            Ok(BufReader::with_capacity(capacity, file))
+        };
         Ok(Self {
             smspec_file: open_file(input_path.with_extension("SMSPEC"))?,
             unsmry_file: open_file(input_path.with_extension("UNSMRY"))?,
@@ -676,7 +718,13 @@ impl InitializeSummary for SummaryFileReader {
                 Ok(params) => {
                     match params {
                         None => break,
-                        Some((n_bytes, params)) => {
+                        Some((n_bytes, n_step_bytes, params)) => {
+                            if n_steps == 0 {
+                                // Time steps take the same number of bytes each, apart from the
+                                // SEQHDR that only starts a report step. Leaving it out of the
+                                // first step errs on the side of too much room for the file.
+                                summary.reserve(unsmry_size as usize / n_step_bytes);
+                            }
                             summary.append(params);
                             n_steps += 1;
                             unsmry_pos += n_bytes as u64;
@@ -695,10 +743,15 @@ impl InitializeSummary for SummaryFileReader {
             }
         }
 
+        // The updater only reads a step at a time, so it does not need to hold on to the large
+        // buffer. Rewind the file to the first unread byte as the buffered data is dropped.
+        let mut unsmry_file = self.unsmry_file.into_inner();
+        unsmry_file.seek(SeekFrom::Start(unsmry_pos))?;
+
         Ok((
             summary,
             SummaryFileUpdater {
-                unsmry_file: self.unsmry_file,
+                unsmry_file: BufReader::new(unsmry_file),
                 n_items,
                 n_steps,
             },
@@ -727,4 +780,33 @@ mod tests {
         // assert!(n_timesteps.is_ok());
         // assert_eq!(n_timesteps.unwrap(), 58);
     }
+
+    #[test]
+    fn start_date_with_microseconds() {
+        assert_eq!(
+            start_date(&[1, 3, 2005]),
+            NaiveDate::from_ymd(2005, 3, 1).and_hms(0, 0, 0)
+        );
+        assert_eq!(
+            start_date(&[1, 3, 2005, 12, 30, 15_250_000]),
+            NaiveDate::from_ymd(2005, 3, 1).and_hms_micro(12, 30, 15, 250_000)
+        );
+    }
+
+    #[test]
+    fn fractional_start_second_is_kept() {
+        let start = NaiveDate::from_ymd(2005, 3, 1).and_hms_micro(0, 0, 0, 600_000);
+        assert_eq!(timestamp_secs(&start), start.timestamp() as f64 + 0.6);
+    }
+
+    #[test]
+    fn init_from_spe_10_files() {
+        let reader = SummaryFileReader::from_path("assets/SPE10.SMSPEC").unwrap();
+        let (summary, _) = reader.init().unwrap();
+
+        assert_eq!(summary.dims, [100, 100, 30]);
+        assert_eq!(summary.n_items(), 34);
+        assert_eq!(summary.n_steps(), 58);
+        assert_eq!(summary.timestamps.len(), 58);
+    }
 }
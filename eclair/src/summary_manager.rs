@@ -1,4 +1,14 @@
-use std::{borrow::Cow, collections::HashSet, thread};
+use std::{
+    borrow::Cow,
+    collections::HashSet,
+    panic,
+    path::{Path, PathBuf},
+    sync::{
+        atomic::{AtomicUsize, Ordering},
+        Arc,
+    },
+    thread,
+};
 
 use chrono::{Duration, NaiveDate, NaiveDateTime, NaiveTime};
 use crossbeam_channel::{Receiver, Sender};
@@ -6,10 +16,11 @@ use crossbeam_channel::{Receiver, Sender};
 #[cfg(feature = "read_zmq")]
 use crate::zmq::ZmqConnection;
 use crate::{
+    error::EclairError,
     summary::{
-        InitializeSummary, ItemId, ItemQualifier, Summary, SummaryFileReader, UpdateSummary,
+        InitializeSummary, ItemId, Summary, SummaryFileReader, SummaryFileUpdater, UpdateSummary,
     },
-    FlexString, Result,
+    Result,
 };
 
 struct UpdatableSummary {
@@ -28,12 +39,93 @@ struct UpdatableSummary {
 /// queries for individual summary item values.
 pub struct SummaryManager {
     summaries: Vec<UpdatableSummary>,
+
+    // Number of files still being read in the background.
+    n_loading: usize,
+
+    // To receive the files read in the background, together with the number of files read.
+    loaded_snd: Sender<(usize, Vec<Result<LoadedSummary>>)>,
+    loaded_rcv: Receiver<(usize, Vec<Result<LoadedSummary>>)>,
+}
+
+type LoadedSummary = (String, Summary, SummaryFileUpdater);
+
+/// Read a file-based summary source and name it after the file stem.
+fn load_from_files(input_path: &Path) -> Result<LoadedSummary> {
+    let reader = SummaryFileReader::from_path(input_path)?;
+    // The reader has checked that the file stem exists.
+    let name = input_path
+        .file_stem()
+        .unwrap()
+        .to_string_lossy()
+        .into_owned();
+    let (data, updater) = reader.init()?;
+    Ok((name, data, updater))
+}
+
+/// Read file-based summary sources concurrently by a pool of at most as many threads as there are
+/// CPUs. The results are returned in the order of the input paths.
+fn load_many_from_files(input_paths: Vec<PathBuf>) -> Vec<Result<LoadedSummary>> {
+    let input_paths = Arc::new(input_paths);
+    let next_path = Arc::new(AtomicUsize::new(0));
+
+    let n_workers = thread::available_parallelism()
+        .map_or(1, |n| n.get())
+        .min(input_paths.len());
+
+    // Every worker keeps taking the next unread file until there are none left.
+    let workers: Vec<_> = (0..n_workers)
+        .map(|_| {
+            let input_paths = Arc::clone(&input_paths);
+            let next_path = Arc::clone(&next_path);
+            thread::spawn(move || {
+                let mut loaded = Vec::new();
+                loop {
+                    let index = next_path.fetch_add(1, Ordering::Relaxed);
+                    match input_paths.get(index) {
+                        Some(input_path) => {
+                            // Malformed input can make the parser panic, which only fails the
+                            // file at hand.
+                            let summary = panic::catch_unwind(|| load_from_files(input_path))
+                                .unwrap_or_else(|_| Err(loader_panicked(input_path)));
+                            loaded.push((index, summary));
+                        }
+                        None => break loaded,
+                    }
+                }
+            })
+        })
+        .collect();
+
+    let mut loaded: Vec<Option<Result<LoadedSummary>>> = input_paths.iter().map(|_| None).collect();
+    for worker in workers {
+        // Should a worker die anyway, the files it had read are reported as failed below.
+        if let Ok(summaries) = worker.join() {
+            for (index, summary) in summaries {
+                loaded[index] = Some(summary);
+            }
+        }
+    }
+
+    loaded
+        .into_iter()
+        .zip(input_paths.iter())
+        .map(|(summary, input_path)| summary.unwrap_or_else(|| Err(loader_panicked(input_path))))
+        .collect()
+}
+
+fn loader_panicked(input_path: &Path) -> EclairError {
+    EclairError::LoaderPanicked(input_path.display().to_string())
 }
 
 impl SummaryManager {
     pub fn new() -> Self {
+        let (loaded_snd, loaded_rcv) = crossbeam_channel::unbounded();
         SummaryManager {
             summaries: Vec::new(),
+            n_loading: 0,
+            loaded_snd,
+            loaded_rcv,
         }
     }
 
@@ -42,8 +134,16 @@ impl SummaryManager {
     }
 
     fn add<R: InitializeSummary>(&mut self, name: &str, reader: R) -> Result<()> {
-        let (data, mut updater) = reader.init()?;
+        let (data, updater) = reader.init()?;
+        self.start_updating(name, data, updater);
+        Ok(())
+    }
 
+    /// Store an initialized summary and spawn a thread that keeps it up to date.
+    fn start_updating<U>(&mut self, name: &str, data: Summary, mut updater: U)
+    where
+        U: UpdateSummary + Send + 'static,
+    {
         // TODO: Once I'm done experimenting, make the channel size a SummaryManager config option.
         let (data_snd, data_rcv) = crossbeam_channel::bounded(10);
 
@@ -64,8 +164,6 @@ impl SummaryManager {
         });
 
         log::info!(target: "Summary Manager", "Added new summary object: {}", name);
-
-        Ok(())
     }
 
     pub fn remove(&mut self, index: usize) -> Result<()> {
@@ -106,6 +204,35 @@ impl SummaryManager {
         self.add(&name, reader)
     }
 
+    /// Read file-based summary data sources in the background, without blocking the caller. The
+    /// sources are added, in the order of the input paths, by the first call to `refresh` after
+    /// all of them have been read. Files that fail to load are logged and skipped.
+    pub fn add_from_files_in_background<P>(&mut self, input_paths: &[P])
+    where
+        P: AsRef<Path>,
+    {
+        let input_paths: Vec<PathBuf> = input_paths
+            .iter()
+            .map(|input_path| input_path.as_ref().to_path_buf())
+            .collect();
+        let n_files = input_paths.len();
+        if n_files == 0 {
+            return;
+        }
+        self.n_loading += n_files;
+
+        let loaded_snd = self.loaded_snd.clone();
+        thread::spawn(move || {
+            // The manager owns the receiving end, so this only fails if it has been dropped.
+            let _ = loaded_snd.send((n_files, load_many_from_files(input_paths)));
+        });
+    }
+
+    /// Number of files that are still being read in the background.
+    pub fn n_loading(&self) -> usize {
+        self.n_loading
+    }
+
     /// Add a new ZeroMQ-based summary data source.
     #[cfg(feature = "read_zmq")]
     pub fn add_from_network(
@@ -125,24 +252,48 @@ impl SummaryManager {
         self.add(&name, reader)
     }
 
-    /// For each summary it tries to pull values from the corresponding receiver channel.
+    /// Add the sources that have finished loading in the background, then for each summary it tries
+    /// to pull values from the corresponding receiver channel.
     pub fn refresh(&mut self) -> Result<bool> {
+        let loaded: Vec<_> = self.loaded_rcv.try_iter().collect();
+        for (n_files, summaries) in loaded {
+            self.n_loading -= n_files;
+            for summary in summaries {
+                match summary {
+                    Ok((name, data, updater)) => self.start_updating(&name, data, updater),
+                    Err(err) => {
+                        log::error!(target: "Summary Manager", "Failed to load a summary: {}", err)
+                    }
+                }
+            }
+        }
+
         let mut new_values = false;
         for summary in &mut self.summaries {
-            loop {
-                if let Ok(params) = summary.data_rcv.try_recv() {
-                    new_values = true;
-                    summary.data.append(params);
-                } else {
-                    break;
-                }
+            // Make room for all pending time steps at once instead of growing every item's values
+            // one step at a time.
+            let n_pending = summary.data_rcv.len();
+            if n_pending > 0 {
+                summary.data.reserve(n_pending);
+            }
+            for params in summary.data_rcv.try_iter() {
+                new_values = true;
+                summary.data.append(params);
             }
         }
         Ok(new_values)
     }
 
     pub fn all_item_ids(&self) -> HashSet<&ItemId> {
-        let mut ids = HashSet::new();
+        // Sources typically share most of their items, so the largest one is a good estimate of
+        // the size of the union and avoids rehashing while it is being built.
+        let capacity = self
+            .summaries
+            .iter()
+            .map(|s| s.data.item_ids.len())
+            .max()
+            .unwrap_or(0);
+        let mut ids = HashSet::with_capacity(capacity);
 
         for summary in &self.summaries {
             ids.extend(summary.data.item_ids.keys());
@@ -150,167 +301,52 @@ impl SummaryManager {
         ids
     }
 
-    /// Get optional values for an item id from all summary sources.
-    fn get_items_for_id(&self, summary_idx: usize, id: ItemId) -> Option<&[f32]> {
-        self.summaries[summary_idx]
-            .data
-            .item_ids
-            .get(&id)
-            .map(|index| {
-                self.summaries[summary_idx].data.items[*index]
-                    .values
-                    .as_slice()
-            })
-    }
-
-    pub fn timestamps(&self, summary_idx: usize) -> &[i64] {
-        self.summaries[summary_idx].data.timestamps.as_slice()
-    }
-
-    pub fn time_item<'a>(&'a self, summary_idx: usize, name: &'_ str) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::Time,
-            },
-        )
-    }
-
-    pub fn performance_item<'a>(&'a self, summary_idx: usize, name: &'_ str) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::Performance,
-            },
-        )
-    }
-
-    pub fn field_item<'a>(&'a self, summary_idx: usize, name: &'_ str) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::Field,
-            },
-        )
-    }
-
-    pub fn aquifer_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        index: i32,
-    ) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::Aquifer { index },
-            },
-        )
-    }
-
-    pub fn block_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        index: i32,
-    ) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::Block { index },
-            },
-        )
+    /// Position of an item in a given summary source. Positions stay valid for as long as the
+    /// source exists, so callers can resolve an id once and then use `item_values` directly.
+    pub fn item_position(&self, summary_idx: usize, id: &ItemId) -> Option<usize> {
+        self.summaries[summary_idx].data.item_ids.get(id).copied()
     }
 
-    pub fn well_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        well_name: &'_ str,
-    ) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::Well {
-                    wg_name: FlexString::from_str(well_name),
-                },
-            },
-        )
+    /// Values of the item at a given position in a given summary source.
+    pub fn item_values(&self, summary_idx: usize, position: usize) -> &[f32] {
+        self.summaries[summary_idx].data.items[position]
+            .values
+            .as_slice()
     }
 
-    pub fn group_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        group_name: &'_ str,
-    ) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::Group {
-                    wg_name: FlexString::from_str(group_name),
-                },
-            },
-        )
-    }
-
-    pub fn region_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        index: i32,
-    ) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::Region {
-                    wg_name: None,
-                    index,
-                },
-            },
-        )
-    }
-
-    pub fn cross_region_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        from: i32,
-        to: i32,
-    ) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::CrossRegionFlow { from, to },
-            },
-        )
+    pub fn timestamps(&self, summary_idx: usize) -> &[i64] {
+        self.summaries[summary_idx].data.timestamps.as_slice()
     }
+}
 
-    pub fn completion_item<'a>(
-        &'a self,
-        summary_idx: usize,
-        name: &'_ str,
-        well_name: &'_ str,
-        index: i32,
-    ) -> Option<&[f32]> {
-        self.get_items_for_id(
-            summary_idx,
-            ItemId {
-                name: FlexString::from_str(name),
-                qualifier: ItemQualifier::Completion {
-                    wg_name: FlexString::from_str(well_name),
-                    index,
-                },
-            },
-        )
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn load_files_in_background() {
+        let input_paths = [
+            "assets/SPE10.SMSPEC",
+            "assets/MISSING.SMSPEC",
+            "assets/SPE10.SMSPEC",
+        ];
+
+        let loaded = load_many_from_files(input_paths.iter().map(PathBuf::from).collect());
+        assert_eq!(loaded.len(), 3);
+        assert!(matches!(&loaded[0], Ok((name, ..)) if name == "SPE10"));
+        assert!(loaded[1].is_err());
+        assert!(matches!(&loaded[2], Ok((name, ..)) if name == "SPE10"));
+
+        let mut manager = SummaryManager::new();
+        manager.add_from_files_in_background(&input_paths);
+        assert_eq!(manager.n_loading(), 3);
+
+        while manager.n_loading() > 0 {
+            thread::sleep(std::time::Duration::from_millis(10));
+            manager.refresh().unwrap();
+        }
+        assert_eq!(manager.length(), 2);
+        assert_eq!(manager.name(0), "SPE10");
+        assert_eq!(manager.name(1), "SPE10");
     }
 }
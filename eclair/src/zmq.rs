@@ -98,10 +98,21 @@ impl UpdateSummary for ZmqUpdater {
 
             if items[1].is_readable() {
                 is_connected = true;
-                let msg = self.conn.sock.recv_multipart(0)?;
+                // Decode both message parts straight from the ZeroMQ buffers instead of copying
+                // them into freshly allocated vectors first.
+                // Both parts have to belong to the same message, or the framing of every
+                // message that follows would be off.
+                let step_msg = self.conn.sock.recv_msg(0)?;
+                if !step_msg.get_more() {
+                    return Err(EclairError::ZeroMqUnexpectedParts(2));
+                }
+                let params_msg = self.conn.sock.recv_msg(0)?;
+                if params_msg.get_more() {
+                    return Err(EclairError::ZeroMqUnexpectedParts(2));
+                }
 
                 // Make sure the time iteration is correct.
-                let current_step = read_i32(msg[0].as_slice()) as usize;
+                let current_step = read_i32(&step_msg) as usize;
                 if current_step != self.n_steps {
                     return Err(EclairError::InvalidMinistepValue {
                         expected: self.n_steps,
@@ -109,7 +120,7 @@ impl UpdateSummary for ZmqUpdater {
                     });
                 }
 
-                let params: Vec<f32> = msg[1]
+                let params: Vec<f32> = params_msg
                     .chunks_exact(std::mem::size_of::<f32>())
                     .map(|chunk| read_f32(chunk))
                     .collect();
@@ -193,11 +204,10 @@ impl InitializeSummary for ZmqConnection {
             }
 
             if items[1].is_readable() {
+                // Deserialize straight from the message bytes. serde_json validates UTF-8 as it
+                // parses, so there is no need for a separate pass over the payload.
                 let json = self.sock.recv_msg(0)?;
-                match json.as_str() {
-                    None => return Err(EclairError::InvalidSmspecJson),
-                    Some(v) => break serde_json::from_str(v)?,
-                };
+                break serde_json::from_slice(&json)?;
             }
         };
 